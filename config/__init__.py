@@ -0,0 +1,3 @@
+"""
+配置包
+"""
@@ -0,0 +1,48 @@
+"""
+配置基础模块：统一加载 .env 并校验必需环境变量
+"""
+import os
+from functools import lru_cache
+from pathlib import Path
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=1)
+def load_env():
+    """
+    加载 .env 并返回通用基础配置（整个进程只解析一次 .env 文件）
+
+    Returns:
+        包含 SERVER_IP / SERVER_PORT / HEARTBEAT_INTERVAL 的字典
+
+    Raises:
+        ValueError: 缺少必需的环境变量时
+    """
+    # 必需环境变量齐全时才跳过 dotenv 解析（纯 Python，属于配置导入的主要开销）；
+    # 只导出其中一个、其余留在 .env 的混合配置仍需解析文件补齐
+    if not (os.getenv('SERVER_IP') and os.getenv('SERVER_PORT')):
+        env_path = Path(__file__).parent / '.env'
+        if env_path.exists():
+            load_dotenv(env_path)
+        else:
+            # 尝试从上级目录加载
+            parent_env_path = Path(__file__).parent.parent / '.env'
+            if parent_env_path.exists():
+                load_dotenv(parent_env_path)
+
+    # 服务器配置（从环境变量读取）
+    server_ip = os.getenv('SERVER_IP')
+    server_port = os.getenv('SERVER_PORT')
+
+    # 验证必需配置
+    if not server_ip:
+        raise ValueError("环境变量 SERVER_IP 未设置，请在 .env 文件中配置")
+    if not server_port:
+        raise ValueError("环境变量 SERVER_PORT 未设置，请在 .env 文件中配置")
+
+    return {
+        'SERVER_IP': server_ip,
+        'SERVER_PORT': int(server_port),
+        # 心跳间隔（秒），默认10秒
+        'HEARTBEAT_INTERVAL': int(os.getenv('HEARTBEAT_INTERVAL', '10')),
+    }
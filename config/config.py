@@ -1,48 +1,48 @@
 """
 配置文件
 """
-import os
-from pathlib import Path
-from dotenv import load_dotenv
-
-# 加载 .env 文件（从当前目录或上级目录）
-env_path = Path(__file__).parent / '.env'
-if env_path.exists():
-    load_dotenv(env_path)
-else:
-    # 尝试从上级目录加载
-    parent_env_path = Path(__file__).parent.parent / '.env'
-    if parent_env_path.exists():
-        load_dotenv(parent_env_path)
-
-# 服务器配置（从环境变量读取）
-SERVER_IP = os.getenv('SERVER_IP')
-SERVER_PORT = os.getenv('SERVER_PORT')
+import sys
+import types
+
+from config._base import load_env
+
+# 基础配置由 _base 统一加载（整个进程只解析一次 .env）
+_BASE = load_env()
+
+SERVER_IP = _BASE['SERVER_IP']
+SERVER_PORT = _BASE['SERVER_PORT']
 
 # WebSocket配置
-HEARTBEAT_INTERVAL = int(os.getenv('HEARTBEAT_INTERVAL', '10'))  # 心跳间隔（秒），默认10秒
+HEARTBEAT_INTERVAL = _BASE['HEARTBEAT_INTERVAL']
 
-# 验证必需配置
-if not SERVER_IP:
-    raise ValueError("环境变量 SERVER_IP 未设置，请在 .env 文件中配置")
-if not SERVER_PORT:
-    raise ValueError("环境变量 SERVER_PORT 未设置，请在 .env 文件中配置")
-SERVER_PORT = int(SERVER_PORT)
+def _freeze(obj):
+    """
+    递归冻结配置对象：dict -> MappingProxyType，list -> tuple
+    字符串键做 intern，常用键查找退化为指针比较，且防止意外修改配置
+    """
+    if isinstance(obj, dict):
+        return types.MappingProxyType({
+            (sys.intern(k) if isinstance(k, str) else k): _freeze(v)
+            for k, v in obj.items()
+        })
+    if isinstance(obj, list):
+        return tuple(_freeze(item) for item in obj)
+    return obj
 
-CONFIG = {
+
+CONFIG = _freeze({
 
     # 模块信息
     "name": "测试模块",
     "description": "这是一个用于测试的模块",
-    
+
     # 输入数据需求
     "input_data": [
-        
+
     ],
-    
+
     # 输出数据需求
     "output_data": [
-        
-    ]
-}
 
+    ]
+})
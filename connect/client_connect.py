@@ -6,12 +6,41 @@ import time
 import logging
 import json
 import os
+import queue
+import random
+import re
+import socket
 import sys
 from datetime import datetime
+
+# 可选的 C 加速：安装 wsaccel 后 websocket-client 的帧掩码/UTF-8 校验走 C 实现
+try:
+    import wsaccel  # noqa: F401
+except ImportError:
+    wsaccel = None
+
 import websocket  # 使用 websocket-client 库
 
-# 确保项目根路径在 sys.path 中，便于绝对导入
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+# JSON 编解码：优先使用 orjson（C 实现，解析/序列化比标准库快数倍），不可用时回退标准库
+try:
+    import orjson as _orjson
+
+    def _loads(data):
+        return _orjson.loads(data)
+
+    def _dumps(obj):
+        # 直接返回 UTF-8 字节：websocket-client 对 bytes 负载原样成帧，
+        # 省去 decode 出中间 str 再在发送时重新编码的两次拷贝
+        return _orjson.dumps(obj)
+except ImportError:
+    _orjson = None
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+# 确保仓库根目录在 sys.path 中，便于按包导入 config 等模块
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
@@ -20,38 +49,77 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-# 使用绝对导入，避免相对导入问题
-try:
-    from model_router import process_request
-except ImportError:
-    # 如果直接导入失败，尝试使用 importlib
-    import importlib.util
-    model_router_path = os.path.join(current_dir, 'model_router.py')
-    spec = importlib.util.spec_from_file_location("model_router", model_router_path)
-    model_router = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(model_router)
-    process_request = model_router.process_request
+# 使用绝对导入（current_dir 已加入 sys.path），让 CPython 的 sys.modules 缓存生效
+from model_router import process_parsed, _normalize_envelope
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 简单文本确认消息集合：命中时直接返回，跳过 JSON 解析
+# 同时包含 bytes 形式：二进制帧到达时一次 memcmp 即可识别，无需 UTF-8 解码
+_ACK_MESSAGES = frozenset({
+    "receive result", b"receive result",
+    "heartbeat confirm", b"heartbeat confirm",
+})
+
+# 消息类型快速预检：在完整 JSON 解析前用正则探测已知类型，
+# 类型未知的帧可 O(1) 丢弃（兼容 message 字段二次编码时键名带转义引号）
+_TYPE_RE = re.compile(r'\\?"type\\?"\s*:\s*\\?"(?:ping|shutdown|execute)')
+_TYPE_RE_BYTES = re.compile(rb'\\?"type\\?"\s*:\s*\\?"(?:ping|shutdown|execute)')
+
+# 出站写线程：单次批量发送的最大帧数
+_WRITE_BATCH_MAX = 32
+# 写线程/工作线程停止哨兵
+_STOP = object()
+
+# 执行任务工作线程：按 meta id 哈希分片，业务执行不阻塞网络回调线程
+_WORKER_COUNT = 2
+_WORKER_QUEUES = []
+_WORKER_LOCK = threading.Lock()
+
+def _worker_loop(q):
+    """
+    工作线程主循环：取出分片队列中的 execute 任务并执行
+    """
+    while True:
+        item = q.get()
+        if item is _STOP:
+            return
+        client, message_data = item
+        client._run_execute(message_data)
+
+def _ensure_workers():
+    """
+    惰性启动工作线程池（进程内只启动一次）
+    """
+    global _WORKER_QUEUES
+    if _WORKER_QUEUES:
+        return
+    with _WORKER_LOCK:
+        if _WORKER_QUEUES:
+            return
+        # 先在本地建满所有队列，再一次性发布，
+        # 避免无锁快速路径读到半填充的列表而索引越界
+        queues = []
+        for _ in range(_WORKER_COUNT):
+            q = queue.SimpleQueue()
+            threading.Thread(target=_worker_loop, args=(q,), daemon=True).start()
+            queues.append(q)
+        _WORKER_QUEUES = queues
+
 def load_config():
     """
-    加载配置文件
-    
+    加载配置文件（常规包导入，重复调用命中 sys.modules 缓存）
+
     Returns:
         配置模块，如果加载失败则返回None
     """
     try:
-        import importlib.util
-        config_path = os.path.join(os.path.dirname(__file__), '../config/config.py')
-        spec = importlib.util.spec_from_file_location("config", config_path)
-        config_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(config_module)
-        return config_module
+        from config import config as loaded_config
+        return loaded_config
     except Exception as e:
-        logger.error(f"加载配置时发生错误: {e}")
+        logger.error("加载配置时发生错误: %s", e)
         return None
 
 # 加载配置并获取 ping 间隔（用于 WebSocket ping/pong 和重连延迟）
@@ -63,10 +131,13 @@ HEARTBEAT_INTERVAL = getattr(config_module, 'HEARTBEAT_INTERVAL')
 if HEARTBEAT_INTERVAL is None:
     raise ValueError("配置文件中缺少 HEARTBEAT_INTERVAL")
 
-def read_module_hash():
+# 模块 hash 在运行期间不会变化：只读一次文件并缓存
+_MODULE_HASH_CACHE = {'loaded': False, 'value': None}
+
+def _read_module_hash_file():
     """
-    读取模块哈希值
-    
+    从磁盘读取模块哈希值
+
     Returns:
         模块哈希值，如果读取失败则返回None
     """
@@ -80,9 +151,35 @@ def read_module_hash():
         logger.error("错误：找不到 module_hash.txt 文件，请先运行 register.py 进行模块注册")
         return None
     except Exception as e:
-        logger.error(f"读取 hash 值时发生错误: {e}")
+        logger.error("读取 hash 值时发生错误: %s", e)
         return None
 
+def read_module_hash():
+    """
+    读取模块哈希值（首次读取后缓存，重连路径不再访问磁盘）
+
+    Returns:
+        模块哈希值，如果读取失败则返回None
+    """
+    if not _MODULE_HASH_CACHE['loaded']:
+        value = _read_module_hash_file()
+        if value is not None:
+            _MODULE_HASH_CACHE['value'] = value
+            _MODULE_HASH_CACHE['loaded'] = True
+        return value
+    return _MODULE_HASH_CACHE['value']
+
+def reload_module_hash():
+    """
+    强制重新读取模块哈希值（重新注册后调用）
+
+    Returns:
+        最新的模块哈希值，如果读取失败则返回None
+    """
+    _MODULE_HASH_CACHE['loaded'] = False
+    _MODULE_HASH_CACHE['value'] = None
+    return read_module_hash()
+
 class WebSocketClient:
     """
     WebSocket客户端类
@@ -106,124 +203,235 @@ class WebSocketClient:
             base_url = f"{url}/websocket"
             
         self.url = f"{base_url}?hash={module_hash}"
-        logger.info(f"连接到 WebSocket URL: {self.url}")
+        logger.info("连接到 WebSocket URL: %s", self.url)
         self.ws = None
         self.is_connected = False
         self.should_reconnect = True  # 是否应该重连
         self.reconnecting = False  # 是否正在重连中
+        self._out_q = queue.SimpleQueue()  # 出站消息队列，由写线程统一批量发送
+        self._writer_thread = None
+        # 重连退避：指数增长加随机抖动，避免多客户端同时断线后齐步重连
+        self._attempt = 0  # 连续失败的重连次数，连接成功后清零
+        self._backoff_base = 1.0  # 首次重连延迟（秒）
+        self._backoff_cap = 60.0  # 最大重连延迟（秒）
+        self._backoff_jitter = 0.3  # 抖动系数
     
+    def _send(self, payload):
+        """
+        将待发送消息投入出站队列，由写线程统一批量发送
+
+        Args:
+            payload: 待发送的文本帧
+        """
+        self._out_q.put(payload)
+
+    def _set_cork(self, enabled):
+        """
+        开关底层 socket 的 TCP_CORK（仅 Linux），把同一批帧合并为更少的网络包
+
+        Args:
+            enabled: 是否开启 cork
+        """
+        try:
+            sock = self.ws.sock.sock
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1 if enabled else 0)
+        except (AttributeError, OSError):
+            # 平台不支持 TCP_CORK 或连接未就绪时静默跳过
+            pass
+
+    def _flush_batch(self, batch):
+        """
+        cork 后把一批帧一次性写出，再 uncork 触发内核发送
+
+        Args:
+            batch: 待发送的帧列表
+        """
+        self._set_cork(True)
+        try:
+            for payload in batch:
+                try:
+                    self.ws.send(payload)
+                except Exception as e:
+                    logger.error("发送消息失败: %s", e)
+        finally:
+            self._set_cork(False)
+
+    def _writer_loop(self):
+        """
+        写线程主循环：攒批取出待发送帧后合并写出，减少 write 系统调用次数
+        """
+        q = self._out_q
+        while True:
+            payload = q.get()
+            if payload is _STOP:
+                return
+            batch = [payload]
+            try:
+                while len(batch) < _WRITE_BATCH_MAX:
+                    extra = q.get_nowait()
+                    if extra is _STOP:
+                        self._flush_batch(batch)
+                        return
+                    batch.append(extra)
+            except queue.Empty:
+                pass
+            self._flush_batch(batch)
+
+    def _handle_ping(self, message_data):
+        """
+        处理 ping 消息
+
+        Args:
+            message_data: 已解析的消息字典
+        """
+        logger.debug("收到 ping 消息，回复 pong")
+        try:
+            self._send(_dumps({
+                "type": "pong",
+                "timestamp": datetime.now().isoformat()
+            }))
+        except Exception as e:
+            logger.error("发送 pong 回复失败: %s", e)
+
+    def _handle_shutdown(self, message_data):
+        """
+        处理 shutdown 命令
+
+        Args:
+            message_data: 已解析的消息字典
+        """
+        logger.info("收到 shutdown 命令，准备关闭模块")
+        # 发送确认消息
+        try:
+            self._send(_dumps({
+                'status': 'success',
+                'message': '模块正在关闭'
+            }))
+        except Exception as e:
+            logger.error("发送 shutdown 确认消息失败: %s", e)
+
+        # 关闭连接（close 会先排空出站队列）
+        self.close()
+        # 兜底：5 秒内未能正常退出则强制终止
+        force_exit = threading.Timer(5.0, lambda: os._exit(1))
+        force_exit.daemon = True
+        force_exit.start()
+        # 刷新日志后正常退出，让 atexit 清理（如日志句柄关闭）得以执行
+        logging.shutdown()
+        sys.exit(0)
+
+    def _handle_execute(self, message_data):
+        """
+        处理 execute 命令：按 meta id 分片投递到工作线程，网络回调线程立即返回
+
+        Args:
+            message_data: 已解析的消息字典
+        """
+        _ensure_workers()
+        meta = message_data.get('meta') or {}
+        shard = hash(str(meta.get('id', ''))) % _WORKER_COUNT
+        _WORKER_QUEUES[shard].put((self, message_data))
+
+    def _run_execute(self, message_data):
+        """
+        在工作线程中执行 execute 请求并回传结果
+
+        Args:
+            message_data: 已解析的消息字典
+        """
+        # 热路径上把频繁访问的属性绑定为局部变量，减少重复的属性查找
+        _send = self._send
+        _log = logger
+
+        _log.info("收到执行命令")
+        # 缩进美化的 JSON 序列化开销大，仅在 DEBUG 级别启用时才执行
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("消息内容: %s", json.dumps(message_data, ensure_ascii=False, indent=2))
+        meta = message_data.get('meta')
+
+        # 调用 process_parsed 处理执行请求（复用已解析的消息，避免重复解析）
+        try:
+            result = process_parsed(message_data)
+            if isinstance(result, dict) and '__raw__' in result:
+                # run_raw 已输出预序列化的结果字节，直接拼接响应信封，跳过整体再序列化
+                raw = result['__raw__']
+                if isinstance(raw, str):
+                    raw = raw.encode('utf-8')
+                _send(b'{"status":"success","meta":' + _dumps(meta) + b',"result":' + raw + b'}')
+            else:
+                response = {
+                    'status': 'success',
+                    'meta': meta,
+                    'result': result
+                }
+                # 发送处理结果
+                _send(_dumps(response))
+            _log.info("执行完成，结果已发送")
+        except Exception as e:
+            _log.exception("处理执行请求时发生异常: %s", e)
+            # 发送错误响应
+            error_response = {
+                'status': 'error',
+                'meta': meta,
+                'message': f'处理请求时发生异常: {str(e)}'
+            }
+            try:
+                _send(_dumps(error_response))
+            except Exception as send_error:
+                _log.error("发送错误响应失败: %s", send_error)
+
+    # 消息类型到处理方法的分发表：O(1) 查表代替逐个字符串比较
+    _HANDLERS = {
+        'ping': _handle_ping,
+        'shutdown': _handle_shutdown,
+        'execute': _handle_execute,
+    }
+
     def on_message(self, ws, message):
         """
         消息处理回调
-        
+
         Args:
             ws: WebSocket连接
             message: 接收到的消息
         """
-        # 处理简单文本消息
-        if message == "receive result":
+        # 处理简单文本确认消息，无需进入 JSON 解析
+        if message in _ACK_MESSAGES:
             logger.info("收到处理结果确认")
             return
-        
-        # 解析 JSON 消息
+
+        # 快速预检：帧内不含任何已知消息类型时直接丢弃，省去完整解析
+        probe = _TYPE_RE_BYTES if isinstance(message, bytes) else _TYPE_RE
+        if not probe.search(message):
+            logger.warning("消息中未找到已知的消息类型，忽略")
+            return
+
+        # 解析 JSON 消息（信封只解析一次，后续直接传递解析结果）
         try:
-            parsed_message = json.loads(message)
-            message_data = parsed_message.get('message')
-            
-            # 如果 message_data 是字符串，尝试解析
-            if isinstance(message_data, str):
-                try:
-                    message_data = json.loads(message_data)
-                except json.JSONDecodeError:
-                    logger.warning(f"无法解析 message 字段中的 JSON: {message_data}")
-                    return
-            
-            # 如果没有 message 字段，直接使用 parsed_message
-            if message_data is None:
-                message_data = parsed_message
-            
+            message_data = _normalize_envelope(message)
+
             # 检查消息类型
             if not isinstance(message_data, dict):
-                logger.warning(f"消息格式无效，期望字典类型: {type(message_data)}")
-                return
-            
-            message_type = message_data.get('type')
-            
-            # 处理 ping 消息
-            if message_type == 'ping':
-                logger.debug("收到 ping 消息，回复 pong")
-                try:
-                    self.ws.send(json.dumps({
-                        "type": "pong",
-                        "timestamp": datetime.now().isoformat()
-                    }))
-                except Exception as e:
-                    logger.error(f"发送 pong 回复失败: {e}")
-                return
-            
-            # 处理 shutdown 命令
-            if message_type == 'shutdown':
-                logger.info("收到 shutdown 命令，准备关闭模块")
-                # 发送确认消息
-                try:
-                    self.ws.send(json.dumps({
-                        'status': 'success',
-                        'message': '模块正在关闭'
-                    }))
-                except Exception as e:
-                    logger.error(f"发送 shutdown 确认消息失败: {e}")
-                
-                # 关闭连接
-                self.close()
-                # 退出程序
-                import os
-                os._exit(0)
-                return
-            
-            # 处理 execute 命令
-            elif message_type == 'execute':
-                logger.info("收到执行命令")
-                logger.debug(f"消息内容: {json.dumps(message_data, ensure_ascii=False, indent=2)}")
-                meta = message_data.get('meta')
-                
-                # 调用 process_request 处理执行请求
-                try:
-                    result = process_request(message)
-                    response = {
-                        'status': 'success',
-                        'meta': meta,
-                        'result': result
-                    }
-                    # 发送处理结果
-                    self.ws.send(json.dumps(response))
-                    logger.info("执行完成，结果已发送")
-                except Exception as e:
-                    logger.exception(f"处理执行请求时发生异常: {e}")
-                    # 发送错误响应
-                    error_response = {
-                        'status': 'error',
-                        'meta': meta,
-                        'message': f'处理请求时发生异常: {str(e)}'
-                    }
-                    try:
-                        self.ws.send(json.dumps(error_response))
-                    except Exception as send_error:
-                        logger.error(f"发送错误响应失败: {send_error}")
+                logger.warning("消息格式无效，期望字典类型: %s", type(message_data))
                 return
-            
-            # 未知消息类型
-            else:
-                logger.warning(f"未知的消息类型: {message_type}")
-                logger.debug(f"完整消息: {json.dumps(message_data, ensure_ascii=False, indent=2)}")
+
+            # 按消息类型查表分发
+            handler = self._HANDLERS.get(message_data.get('type'))
+            if handler is None:
+                logger.warning("未知的消息类型: %s", message_data.get('type'))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("完整消息: %s", json.dumps(message_data, ensure_ascii=False, indent=2))
                 return
-                
+            handler(self, message_data)
+            return
+
         except json.JSONDecodeError as e:
-            logger.error(f"JSON 解析失败: {e}")
-            logger.debug(f"原始消息: {message}")
+            logger.error("JSON 解析失败: %s", e)
+            logger.debug("原始消息: %s", message)
             return
         except Exception as e:
-            logger.exception(f"处理消息时发生未预期的异常: {e}")
-            logger.debug(f"原始消息: {message}")
+            logger.exception("处理消息时发生未预期的异常: %s", e)
+            logger.debug("原始消息: %s", message)
             return
         
     
@@ -235,7 +443,7 @@ class WebSocketClient:
             ws: WebSocket连接
             error: 错误信息
         """
-        logger.error(f"WebSocket连接发生错误: {error}")
+        logger.error("WebSocket连接发生错误: %s", error)
         # 标记连接已断开，触发重连
         self.is_connected = False
     
@@ -248,12 +456,11 @@ class WebSocketClient:
             close_status_code: 关闭状态码
             close_msg: 关闭消息
         """
-        logger.info(f"WebSocket连接已关闭 (状态码: {close_status_code}, 消息: {close_msg})")
+        logger.info("WebSocket连接已关闭 (状态码: %s, 消息: %s)", close_status_code, close_msg)
         self.is_connected = False
         
         # 如果应该重连且不在重连中，启动重连
         if self.should_reconnect and not self.reconnecting:
-            logger.info(f"将在 {HEARTBEAT_INTERVAL} 秒后尝试重新连接...")
             threading.Thread(target=self._reconnect_after_delay, daemon=True).start()
     
     def on_open(self, ws):
@@ -265,19 +472,40 @@ class WebSocketClient:
         """
         logger.info("WebSocket连接已建立")
         self.is_connected = True
+        # 连接成功，重置重连退避计数
+        self._attempt = 0
+        # 启动出站写线程（已存活则复用）
+        if self._writer_thread is None or not self._writer_thread.is_alive():
+            self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer_thread.start()
     
+    def _next_backoff_delay(self):
+        """
+        计算下一次重连延迟：指数退避（1.5 倍增长）加随机抖动，封顶 backoff_cap
+
+        Returns:
+            延迟秒数
+        """
+        # 指数做钳制：长时间断线时 _attempt 可以涨到上千，1.5 ** 1800 会 OverflowError
+        delay = min(self._backoff_cap, self._backoff_base * (1.5 ** min(self._attempt, 64)))
+        delay += random.random() * self._backoff_jitter * delay
+        self._attempt += 1
+        return delay
+
     def _reconnect_after_delay(self):
         """
         延迟后重连
         """
         if self.reconnecting:
             return
-        
+
         self.reconnecting = True
         try:
-            # 等待心跳间隔时间
-            time.sleep(HEARTBEAT_INTERVAL)
-            
+            # 指数退避加随机抖动，避免多个客户端断线后同时重连造成惊群
+            delay = self._next_backoff_delay()
+            logger.info("将在 %.1f 秒后尝试重新连接...", delay)
+            time.sleep(delay)
+
             # 检查是否还需要重连（可能已经连接成功或主动关闭）
             if not self.should_reconnect:
                 return
@@ -292,13 +520,11 @@ class WebSocketClient:
                 # 已经连接成功，不需要重连
                 logger.info("连接已恢复，取消重连")
         except Exception as e:
-            logger.error(f"重连过程中发生错误: {e}")
+            logger.error("重连过程中发生错误: %s", e)
             self.reconnecting = False
-            # 如果重连失败且应该继续重连，等待心跳间隔后再次尝试
-            if self.should_reconnect:
-                time.sleep(HEARTBEAT_INTERVAL)
-                if not self.is_connected:
-                    threading.Thread(target=self._reconnect_after_delay, daemon=True).start()
+            # 如果重连失败且应该继续重连，按退避延迟后再次尝试
+            if self.should_reconnect and not self.is_connected:
+                threading.Thread(target=self._reconnect_after_delay, daemon=True).start()
         finally:
             # 确保标志被重置（如果 connect() 返回了）
             if self.reconnecting:
@@ -311,7 +537,7 @@ class WebSocketClient:
         # 启用跟踪以便调试
         # websocket.enableTrace(True)
         
-        logger.info(f"尝试连接到: {self.url}")
+        logger.info("尝试连接到: %s", self.url)
         
         try:
             # 创建WebSocket连接
@@ -332,11 +558,11 @@ class WebSocketClient:
             )
                 
         except Exception as e:
-            logger.error(f"连接过程中发生异常: {e}")
+            logger.error("连接过程中发生异常: %s", e)
             self.is_connected = False
             # 如果连接失败，等待后重试（on_close 可能不会触发，所以这里需要处理）
             if self.should_reconnect and not self.reconnecting:
-                logger.info(f"连接失败，将在 {HEARTBEAT_INTERVAL} 秒后尝试重新连接...")
+                logger.info("连接失败，准备按退避延迟重新连接...")
                 threading.Thread(target=self._reconnect_after_delay, daemon=True).start()
     
     def close(self):
@@ -346,22 +572,26 @@ class WebSocketClient:
         logger.info("正在关闭WebSocket连接...")
         self.should_reconnect = False  # 停止重连
         self.is_connected = False
+        # 通知写线程在发完队列中剩余消息后退出
+        self._out_q.put(_STOP)
+        if (self._writer_thread and self._writer_thread.is_alive()
+                and threading.current_thread() is not self._writer_thread):
+            self._writer_thread.join(timeout=2)
         if self.ws:
             try:
                 self.ws.close()
             except Exception as e:
-                logger.error(f"关闭连接时发生错误: {e}")
+                logger.error("关闭连接时发生错误: %s", e)
 
 def main():
     """
     主函数
     """
-    # 加载配置
-    config_module = load_config()
+    # 复用模块加载时的配置（load_config 已缓存，不会重复执行配置文件）
     if not config_module:
         logger.error("无法加载配置文件，程序退出")
         return
-    
+
     # 从配置读取服务器地址和端口
     server_ip = getattr(config_module, 'SERVER_IP')
     server_port = getattr(config_module, 'SERVER_PORT')
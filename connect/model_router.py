@@ -1,12 +1,32 @@
 """
 请求处理模块，直接调用模块的 run 方法
 """
+import atexit
 import json
 import logging
 import os
 import sys
+import threading
+import time
 from datetime import datetime
 
+# JSON 编解码：优先使用 orjson（C 实现，解析/序列化比标准库快数倍），不可用时回退标准库
+try:
+    import orjson as _orjson
+
+    def _loads(data):
+        return _orjson.loads(data)
+
+    def _dumps_line(obj):
+        # 直接生成带换行符的 UTF-8 字节，写日志时免去再次编码
+        return _orjson.dumps(obj, option=_orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    _orjson = None
+    _loads = json.loads
+
+    def _dumps_line(obj):
+        return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -20,42 +40,129 @@ main_dir = os.path.join(os.path.dirname(__file__), '../main')
 if main_dir not in sys.path:
     sys.path.insert(0, main_dir)
 
-# 导入 main.main 模块
+# 导入 main.main 模块（main_dir 已加入 sys.path，走 sys.modules 缓存，避免重复 exec 文件）
 try:
-    import importlib.util
-    main_path = os.path.join(main_dir, 'main.py')
-    spec = importlib.util.spec_from_file_location("main_main", main_path)
-    main_main = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(main_main)
+    import main as main_main
     run = main_main.run
+    # 可选的预序列化入口：模块可提供 run_raw(data, args=...) 直接返回 JSON 字节，
+    # 让网络层零拷贝发送，省去一次完整序列化
+    run_raw = getattr(main_main, 'run_raw', None)
 except Exception as e:
-    logger.error(f"无法导入 main.main 模块: {e}")
+    logger.error("无法导入 main.main 模块: %s", e)
     raise
 
 
+# 按日期缓存的日志文件句柄，避免每条消息都执行 open/write/close 三次系统调用
+_LOG_FH = {}
+_LOG_FH_LOCK = threading.Lock()
+# 每写入多少条日志强制刷一次缓冲
+_LOG_FLUSH_EVERY = 32
+_log_write_count = 0
+
+
+# 当天日期字符串缓存：只在跨天时重新 strftime
+_DATE_CACHE = {'key': None, 'date': ''}
+
+
+def _today():
+    """
+    返回当天日期字符串（YYYY-MM-DD），按天缓存避免每条日志都格式化
+    :return: 日期字符串
+    """
+    now = time.localtime()
+    key = (now.tm_year, now.tm_yday)
+    if _DATE_CACHE['key'] != key:
+        _DATE_CACHE['key'] = key
+        _DATE_CACHE['date'] = time.strftime('%Y-%m-%d', now)
+    return _DATE_CACHE['date']
+
+
+def _get_log_fh(today):
+    """
+    获取当天日志文件的缓存句柄，日期滚动时关闭过期句柄
+    :param today: 当天日期字符串（YYYY-MM-DD）
+    :return: 以追加模式打开的二进制文件句柄
+    """
+    fh = _LOG_FH.get(today)
+    if fh is None or fh.closed:
+        # 日期滚动：关闭并移除过期句柄
+        for old_date in [d for d in _LOG_FH if d != today]:
+            try:
+                _LOG_FH.pop(old_date).close()
+            except Exception:
+                pass
+        log_file = os.path.join(LOG_DIR, f'execution_{today}.log')
+        fh = open(log_file, 'ab', buffering=1 << 16)
+        _LOG_FH[today] = fh
+    return fh
+
+
+def _close_log_fh():
+    """
+    进程退出时刷新并关闭所有缓存的日志句柄
+    """
+    with _LOG_FH_LOCK:
+        for fh in _LOG_FH.values():
+            try:
+                fh.close()
+            except Exception:
+                pass
+        _LOG_FH.clear()
+
+
+atexit.register(_close_log_fh)
+
+
 def save_meta_log(meta):
     """
     保存 meta 信息到本地日志文件
     :param meta: 元信息字典
     """
+    global _log_write_count
     try:
-        # 生成日志文件名（按日期）
-        today = datetime.now().strftime('%Y-%m-%d')
-        log_file = os.path.join(LOG_DIR, f'execution_{today}.log')
-        
-        # 添加时间戳
+        # 日志文件名按日期（缓存，跨天才重新格式化）
+        today = _today()
+
+        # 添加时间戳（一次 datetime.now() 即可）
         log_entry = {
             'timestamp': datetime.now().isoformat(),
             'meta': meta
         }
-        
-        # 追加写入日志文件
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
-        
-        logger.debug(f"元信息已保存到日志文件: {log_file}")
+
+        # 复用缓存句柄追加写入（按字节写入，跳过 UTF-8 再编码）
+        with _LOG_FH_LOCK:
+            fh = _get_log_fh(today)
+            fh.write(_dumps_line(log_entry))
+            _log_write_count += 1
+            if _log_write_count % _LOG_FLUSH_EVERY == 0:
+                fh.flush()
+
+        logger.debug("元信息已保存到日志文件: execution_%s.log", today)
     except Exception as e:
-        logger.error(f"保存元信息日志失败: {e}")
+        logger.error("保存元信息日志失败: %s", e)
+
+
+def _normalize_envelope(raw):
+    """
+    将原始消息规范化为消息字典，整个过程只解析一次外层 JSON
+    :param raw: 原始消息（str/bytes 或已解析的字典）
+    :return: 规范化后的消息字典
+    """
+    # 外层信封只解析一次
+    if isinstance(raw, (str, bytes)):
+        raw = _loads(raw)
+
+    message_data = raw.get('message') if isinstance(raw, dict) else raw
+
+    # 兼容旧格式：message 字段可能是再编码一层的 JSON 字符串
+    if isinstance(message_data, (str, bytes)):
+        message_data = _loads(message_data)
+
+    # 如果没有 message 字段，直接使用外层数据
+    if message_data is None:
+        message_data = raw
+
+    return message_data
 
 
 def process_request(json_data):
@@ -65,28 +172,35 @@ def process_request(json_data):
     :return: 处理结果
     """
     try:
-        # 解析JSON数据
-        if isinstance(json_data, str):
-            try:
-                parsed_json = json.loads(json_data)
-                message_data = parsed_json.get('message')
-            except json.JSONDecodeError:
-                logger.error("JSON解析失败")
-                return {
-                    'status': 'error',
-                    'message': 'JSON格式错误'
-                }
-        else:
-            message_data = json_data.get('message')
-
-        # 解析 message 字段中的数据
-        if isinstance(message_data, str):
-            message_data = json.loads(message_data)
-        
+        # 规范化消息信封（只解析一次）
+        try:
+            message_data = _normalize_envelope(json_data)
+        except json.JSONDecodeError:
+            logger.error("JSON解析失败")
+            return {
+                'status': 'error',
+                'message': 'JSON格式错误'
+            }
+        return process_parsed(message_data)
+    except Exception as e:
+        logger.exception("处理请求时发生异常: %s", e)
+        return {
+            'status': 'error',
+            'message': f'处理请求时发生异常: {str(e)}'
+        }
+
+
+def process_parsed(message_data):
+    """
+    处理已解析的消息字典，直接调用模块的 run 方法
+    :param message_data: 已规范化的消息字典
+    :return: 处理结果
+    """
+    try:
         # 提取执行数据和参数
         # 消息格式: {"type": "execute", "meta": {...}, "args": {...}}
         if not isinstance(message_data, dict) or message_data.get('type') != 'execute':
-            logger.error(f"无效的消息格式: {message_data}")
+            logger.error("无效的消息格式: %s", message_data)
             return {
                 'status': 'error',
                 'message': '无效的消息格式，期望 type 为 execute'
@@ -106,16 +220,20 @@ def process_request(json_data):
             'meta': meta,
         }
         
-        logger.info(f"提取到参数: {args}")
-        logger.info(f"执行元信息: {meta}")
+        logger.info("提取到参数: %s", args)
+        logger.info("执行元信息: %s", meta)
         
         # 调用模块的 run 方法，传入 data 和 args
+        # 模块提供 run_raw 时优先使用，其预序列化结果以 __raw__ 键透传给网络层
+        if run_raw is not None:
+            logger.info("调用模块 run_raw 方法")
+            return {'__raw__': run_raw(data, args=args)}
         logger.info("调用模块 run 方法")
         result = run(data, args=args)
         return result
         
     except Exception as e:
-        logger.exception(f"处理请求时发生异常: {str(e)}")
+        logger.exception("处理请求时发生异常: %s", e)
         return {
             'status': 'error',
             'message': f'处理请求时发生异常: {str(e)}'
@@ -3,31 +3,49 @@
 """
 import requests
 import os
+import functools
 import logging
 import hashlib
-import importlib.util
 import json
+import sys
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
+# 确保仓库根目录在 sys.path 中，便于按包导入 config 下的模块
+PROJECT_ROOT = os.path.abspath(os.path.join(current_dir, '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# 全局复用的 HTTP 会话：keep-alive 连接复用，避免每次请求都重新 TCP/TLS 握手
+_SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+_SESSION.mount('http://', _adapter)
+_SESSION.mount('https://', _adapter)
+
+
+@functools.lru_cache(maxsize=1)
+def load_config():
+    """
+    加载配置模块（常规包导入，进程内只执行一次配置文件）
+
+    Returns:
+        配置模块
+    """
+    from config import config as config_module
+    return config_module
 
 def load_model_config():
     """
     加载数据需求配置
-    
+
     Returns:
         数据需求配置
     """
     try:
-        # 使用绝对路径导入配置文件
-        config_path = os.path.join(current_dir, '../config/config.py')
-        spec = importlib.util.spec_from_file_location("config", config_path)
-        config_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(config_module)
-        return config_module.CONFIG
+        return load_config().CONFIG
     except ImportError as e:
         logger.error(f"错误：无法导入配置文件: {e}")
         return None
@@ -35,6 +53,20 @@ def load_model_config():
         logger.error(f"加载配置时发生错误: {e}")
         return None
 
+def _iter_files(root):
+    """
+    递归遍历目录下的所有文件路径
+    os.scandir 的 DirEntry 自带类型信息，比 os.walk 少 stat 调用和列表构造
+
+    :param root: 起始目录
+    :return: 文件路径生成器
+    """
+    for entry in os.scandir(root):
+        if entry.is_dir():
+            yield from _iter_files(entry.path)
+        else:
+            yield entry.path
+
 def test_module_register():
     """
     测试模块注册
@@ -45,13 +77,9 @@ def test_module_register():
         logger.error("无法获取数据需求配置，程序退出")
         return
     
-    # 加载配置模块以获取服务器地址和端口
+    # 加载配置模块以获取服务器地址和端口（复用缓存，不再重复执行配置文件）
     try:
-        import importlib.util
-        config_path = os.path.join(current_dir, '../config/config.py')
-        spec = importlib.util.spec_from_file_location("config", config_path)
-        config_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(config_module)
+        config_module = load_config()
         server_ip = getattr(config_module, 'SERVER_IP')
         server_port = getattr(config_module, 'SERVER_PORT')
         
@@ -72,15 +100,22 @@ def test_module_register():
     execute_dir = os.path.join(current_dir, '../main')
     hash_obj = hashlib.md5()
     
-    # 遍历文件夹中的所有文件
-    for root, dirs, files in os.walk(execute_dir):
-        for file in sorted(files):  # 排序以确保 hash 值稳定
-            file_path = os.path.join(root, file)
-            # 读取文件内容并更新 hash
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b''):
-                    hash_obj.update(chunk)
-                    
+    # 遍历文件夹中的所有文件（全局排序以确保 hash 值稳定）
+    # Python 3.11+ 提供 hashlib.file_digest：C 级读取循环，比 Python 层小块 read 快
+    use_file_digest = hasattr(hashlib, 'file_digest')
+    for file_path in sorted(_iter_files(execute_dir)):
+        # 计算单个文件的 md5，再汇入总 hash（两种路径结果一致）
+        with open(file_path, 'rb') as f:
+            if use_file_digest:
+                file_md5 = hashlib.file_digest(f, 'md5')
+            else:
+                # 旧版本回退：加大读缓冲，减少 read 调用次数
+                file_md5 = hashlib.md5()
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    file_md5.update(chunk)
+            hash_obj.update(file_md5.digest())
+
+
     execute_hash = hash_obj.hexdigest()
     logger.info(f"执行文件夹的 hash 值: {execute_hash}")
     
@@ -88,15 +123,16 @@ def test_module_register():
     params = {
         'name': model_config['name'],
         'description': model_config['description'],
-        'input_data': json.dumps(model_config['input_data']),
-        'output_data': json.dumps(model_config['output_data']),
+        # CONFIG 已冻结（list -> tuple、dict -> MappingProxyType），序列化时转回普通类型
+        'input_data': json.dumps(model_config['input_data'], default=dict),
+        'output_data': json.dumps(model_config['output_data'], default=dict),
         'modelHash': execute_hash
     }
     print(params)
     
     try:
-        # 发送GET请求
-        response = requests.get(url, params=params)
+        # 发送GET请求（复用全局会话）
+        response = _SESSION.get(url, params=params)
         
         # 检查响应状态码
         if response.status_code == 200:
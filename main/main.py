@@ -20,21 +20,20 @@ def run(data, args=None):
     :param args: 从服务器传入的参数字典，可选
     :return: 处理结果字典
     """
-    # 记录收到的调用参数
-    logger.info("=" * 60)
+    # 记录收到的调用请求；完整参数转储降为 DEBUG，默认 INFO 级别不再序列化
     logger.info("收到模块调用请求")
-    logger.info(f"接收到的 data 参数: {json.dumps(data, ensure_ascii=False, indent=2)}")
-    logger.info(f"接收到的 args 参数: {json.dumps(args if args else {}, ensure_ascii=False, indent=2)}")
-    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("接收到的 data 参数: %s", json.dumps(data, ensure_ascii=False, indent=2))
+        logger.debug("接收到的 args 参数: %s", json.dumps(args if args else {}, ensure_ascii=False, indent=2))
+
     # 如果没有传入 args，使用空字典
     if args is None:
         args = {}
-    
+
     # 执行业务逻辑
     reply = args.get('print', 'args error')
-    
-    logger.info(f"执行结果: {reply}")
-    logger.info("=" * 60)
+
+    logger.info("执行结果: %s", reply)
     
     return {
         'status': 'success',